@@ -4,93 +4,100 @@ from typing import Union
 from .backends.type_defs import DataType, ValueType
 from .scanner import Token
 
+# The AST is a tree of small slotted dataclasses, one object per node. An
+# index-based struct-of-arrays store was considered instead, but everything
+# downstream (the type checker, the compiler, `find` and `dump` below)
+# dispatches on node classes with isinstance, so node ids would force a
+# rewrite of the whole pipeline for little gain now that the nodes carry no
+# per-instance __dict__.
 
-@dataclass
+
+@dataclass(slots=True)
 class Ast:
     token: Token
 
 
 class operator(Ast):
-    ...
+    __slots__ = ()
 
 
 class And(operator):
-    ...
+    __slots__ = ()
 
 
 class Or(operator):
-    ...
+    __slots__ = ()
 
 
 class Add(operator):
-    ...
+    __slots__ = ()
 
 
 class Div(operator):
-    ...
+    __slots__ = ()
 
 
 class Mod(operator):
-    ...
+    __slots__ = ()
 
 
 class Mult(operator):
-    ...
+    __slots__ = ()
 
 
 class Pow(operator):
-    ...
+    __slots__ = ()
 
 
 class Sub(operator):
-    ...
+    __slots__ = ()
 
 
 class unaryop(Ast):
-    ...
+    __slots__ = ()
 
 
 class Not(unaryop):
-    ...
+    __slots__ = ()
 
 
 class USub(unaryop):
-    ...
+    __slots__ = ()
 
 
 class Eq(operator):
-    ...
+    __slots__ = ()
 
 
 class Gt(operator):
-    ...
+    __slots__ = ()
 
 
 class GtE(operator):
-    ...
+    __slots__ = ()
 
 
 class Lt(operator):
-    ...
+    __slots__ = ()
 
 
 class LtE(operator):
-    ...
+    __slots__ = ()
 
 
 class NotEq(operator):
-    ...
+    __slots__ = ()
 
 
 class stmt(Ast):
-    ...
+    __slots__ = ()
 
 
 class expr(stmt):
-    ...
+    __slots__ = ()
 
 
-@dataclass
+@dataclass(slots=True)
 class Module:
     body: list[stmt] = field(default_factory=list)
 
@@ -98,20 +105,25 @@ class Module:
 # Literals
 
 
-@dataclass
+@dataclass(slots=True)
 class Constant(expr):
     value: ValueType
     type: DataType
 
 
-@dataclass
+@dataclass(slots=True)
 class Vec3(expr):
     x: expr
     y: expr
     z: expr
 
 
-@dataclass
+@dataclass(slots=True)
+class ListLiteral(expr):
+    elements: list[expr]
+
+
+@dataclass(slots=True)
 class Rgba(expr):
     r: Union[None, expr]
     g: Union[None, expr]
@@ -122,7 +134,7 @@ class Rgba(expr):
 # Variables
 
 
-@dataclass
+@dataclass(slots=True)
 class Name(expr):
     id: str
 
@@ -130,32 +142,32 @@ class Name(expr):
 # Expressions
 
 
-@dataclass
+@dataclass(slots=True)
 class UnaryOp(expr):
     op: unaryop
     operand: expr
 
 
-@dataclass
+@dataclass(slots=True)
 class BinOp(expr):
     left: expr
     op: operator
     right: expr
 
 
-@dataclass
+@dataclass(slots=True)
 class Attribute(expr):
     value: expr
     attr: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Keyword(expr):
     arg: str
     value: expr
 
 
-@dataclass
+@dataclass(slots=True)
 class Call(expr):
     func: Union[Name, Attribute]
     pos_args: list[expr]
@@ -165,14 +177,14 @@ class Call(expr):
 # Statements
 
 
-@dataclass
+@dataclass(slots=True)
 class arg(Ast):
     arg: str
     type: DataType
     default: Union[None, expr]
 
 
-@dataclass
+@dataclass(slots=True)
 class FunctionDef(stmt):
     name: str
     args: list[arg]
@@ -180,7 +192,7 @@ class FunctionDef(stmt):
     returns: list[arg]
 
 
-@dataclass
+@dataclass(slots=True)
 class NodegroupDef(stmt):
     name: str
     args: list[arg]
@@ -188,19 +200,19 @@ class NodegroupDef(stmt):
     returns: list[arg]
 
 
-@dataclass
+@dataclass(slots=True)
 class Out(stmt):
     targets: list[Union[None, Name]]
     value: expr
 
 
-@dataclass
+@dataclass(slots=True)
 class Assign(stmt):
     targets: list[Union[None, Name]]
     value: expr
 
 
-@dataclass
+@dataclass(slots=True)
 class Loop(stmt):
     var: Union[None, Name]
     start: int
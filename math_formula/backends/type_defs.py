@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import IntEnum, auto
 from typing import Union
 
@@ -130,7 +130,7 @@ class BuiltinNode:
     outputs: list[tuple[str, DataType]]
 
 
-@dataclass
+@dataclass(slots=True)
 class NodeInstance:
     # Key in the nodes dict
     key: str
@@ -140,9 +140,17 @@ class NodeInstance:
     outputs: list[int]
     # Props that are set along with their value
     props: list[tuple[str, ValueType]]
+    # The used output indices in reverse order. Precomputed here because
+    # the interpreter builds structs back to front on every CALL_BUILTIN.
+    reversed_outputs: tuple[int, ...] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.reversed_outputs = tuple(reversed(self.outputs))
 
 
 class Operation:
+    __slots__ = ("op_type", "data")
+
     def __init__(self, op_type: OpType, data) -> None:
         self.op_type = op_type
         self.data = data
@@ -217,6 +225,12 @@ class Const(ty_expr):
     value: ValueType
 
 
+@dataclass
+class TyList(ty_expr):
+    # Type-checked elements of a list literal (join_geometry).
+    elements: list[ty_expr]
+
+
 @dataclass
 class Var(ty_expr):
     id: str
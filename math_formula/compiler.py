@@ -1,3 +1,4 @@
+from . import ast_defs
 from .backends import type_defs as td
 from .backends.geometry_nodes import GeometryNodesBackEnd
 from .backends.main import BackEnd
@@ -31,11 +32,27 @@ class Compiler:
             self.type_checker = TypeChecker(self.back_end, {})
         self.curr_function: td.TyFunction | None = None
 
+    def reset(self) -> None:
+        """Clear everything accumulated by previous compilations.
+
+        The back end is kept, so its builtin node tables don't have to
+        be rebuilt when a compiler instance is reused.
+        """
+        self.operations = []
+        self.errors = []
+        self.type_checker = TypeChecker(self.back_end, {})
+        self.curr_function = None
+
     def check_functions(self, source: str) -> bool:
         self.type_checker.type_check(source)
         self.errors = self.type_checker.errors
         return self.errors == []
 
+    def check_functions_ast(self, ast: ast_defs.Module) -> bool:
+        self.type_checker.type_check_ast(ast)
+        self.errors = self.type_checker.errors
+        return self.errors == []
+
     def compile(self, source: str) -> bool:
         succeeded = self.type_checker.type_check(source)
         typed_ast = self.type_checker.typed_repr
@@ -134,6 +151,8 @@ class Compiler:
     def compile_expr(self, expr: td.ty_expr):
         if isinstance(expr, td.Const):
             self.const(expr)
+        elif isinstance(expr, td.TyList):
+            self.list_literal(expr)
         elif isinstance(expr, td.Var):
             self.var(expr)
         elif isinstance(expr, td.NodeCall):
@@ -193,7 +212,6 @@ class Compiler:
     def node_call(self, expr: td.NodeCall):
         # Special handling for join_geometry(a, b, c) → join_geometry([a, b, c])
         if getattr(expr.node, "node_id", "") == "join_geometry" and len(expr.args) > 1:
-            print("join_geometry args:", expr.args)
             for arg in expr.args:
                 self.compile_expr(arg)
                 if arg.stype == td.StackType.STRUCT:
@@ -213,6 +231,18 @@ class Compiler:
     def const(self, const: td.Const):
         self.operations.append(td.Operation(td.OpType.PUSH_VALUE, const.value))
 
+    def list_literal(self, list_literal: td.TyList):
+        # Compile each element like any other argument: variables are
+        # instantiated if needed and struct results are reduced to their
+        # first output, so the packed list only holds sockets and values.
+        for element in list_literal.elements:
+            self.compile_expr(element)
+            if element.stype == td.StackType.STRUCT:
+                self.operations.append(td.Operation(td.OpType.GET_OUTPUT, 0))
+        self.operations.append(
+            td.Operation(td.OpType.PACK_LIST, len(list_literal.elements))
+        )
+
     def var(self, var: td.Var):
         # We should only end up here when we want to 'load' a variable.
         # If the name doesn't exist yet, create a default value
@@ -106,7 +106,8 @@ class Editor:
             [len(line) + 1 for i, line in enumerate(self.lines) if i < self.cursor_row]
         )
         text = self.get_text()[:text_start]
-        parser = Parser(text)
+        # Suggestions only need the AST, not error messages.
+        parser = Parser(text, collect_errors=False)
         ast = parser.parse()
         # Find where we are in the ast.
         # We know that we're always in the last statement, so we can speed up the search a little.
@@ -1,11 +1,16 @@
+import hashlib
+import mmap
 import os
 import pickle
+import pickletools
+from concurrent.futures import ThreadPoolExecutor
 
 import bpy
 
+from . import ast_defs
 from .backends.type_defs import FileData
 from .compiler import Compiler
-from .mf_parser import Error
+from .mf_parser import Error, Parser
 
 extension_dir = bpy.utils.extension_path_user(__package__, create=True)
 custom_implementations_dir = bpy.utils.extension_path_user(
@@ -19,67 +24,152 @@ default_implementations_dir = os.path.join(
 )
 file_data = FileData()
 
+# Bump this whenever the parser or the cache layout changes,
+# so that stale caches are recompiled instead of loaded.
+CACHE_VERSION = 4
+
+# Cached add-on preferences; every attribute in the lookup chain is an
+# RNA resolve, so only walk it once per load.
+_prefs = None
+
+
+def _get_prefs():
+    global _prefs
+    if _prefs is None:
+        _prefs = bpy.context.preferences.addons[__package__].preferences
+    return _prefs
+
+
+# One compiler per tree type, reused across loads so the back end setup
+# is only paid once.
+_compilers: dict[str, Compiler] = {}
+
+
+def _get_compiler(tree_type: str) -> Compiler:
+    compiler = _compilers.get(tree_type)
+    if compiler is None:
+        compiler = Compiler(tree_type)
+        _compilers[tree_type] = compiler
+    else:
+        compiler.reset()
+    return compiler
+
+
+def _check_sources(
+    tree_type: str, modules: list[tuple[str, ast_defs.Module]]
+) -> tuple[Compiler, list[tuple[str, list[Error]]]]:
+    """Type check all parsed modules for one tree type, in order.
+
+    Files have to be checked serially because later files may call
+    functions defined in earlier ones, but the two tree types are
+    completely independent of each other.
+    """
+    suffix = "_gn" if tree_type == "GeometryNodeTree" else "_sh"
+    other_suffix = "_sh" if tree_type == "GeometryNodeTree" else "_gn"
+    compiler = _get_compiler(tree_type)
+    errors: list[tuple[str, list[Error]]] = []
+    for filename, module in modules:
+        if filename.endswith(suffix) or not filename.endswith(other_suffix):
+            succeeded = compiler.check_functions_ast(module)
+            if not succeeded:
+                errors.append((filename, compiler.errors))
+    return compiler, errors
+
 
 @bpy.app.handlers.persistent  # type: ignore
 def load_custom_implementations(
     dummy, dir: str = "", force_update: bool = False
 ) -> list[tuple[str, list[Error]]]:
+    # Loading a file may come with different preferences.
+    global _prefs
+    _prefs = None
     if dir == "" or dir is None:
-        prefs = bpy.context.preferences.addons[__package__].preferences
-        dir = prefs.custom_implementations_folder  # type:ignore
+        dir = _get_prefs().custom_implementations_folder  # type:ignore
     # Load the default standard library first.
-    filepaths = [
-        os.path.join(default_implementations_dir, filename)
-        for filename in sorted(os.listdir(default_implementations_dir))
-    ]
+    # scandir gives us the name and path in one go, without a stat per file.
+    with os.scandir(default_implementations_dir) as entries:
+        files = sorted((entry.name, entry.path) for entry in entries)
     # Now we load the custom implementations
     # so that they can overwrite defaults if wanted.
-    filepaths.extend(
-        [os.path.join(dir, filename) for filename in sorted(os.listdir(dir))]
-    )
+    with os.scandir(dir) as entries:
+        files.extend(sorted((entry.name, entry.path) for entry in entries))
     errors: list[tuple[str, list[Error]]] = []
     file_data.geometry_nodes = {}
     file_data.shader_nodes = {}
-    if not force_update:
-        for filepath in filepaths:
-            filename = os.path.basename(filepath)
-            if filename.startswith("cache"):
-                with open(filepath, "rb") as f:
-                    cached = pickle.load(f)
-                    if filename.endswith("_gn"):
-                        file_data.geometry_nodes = cached
-                    elif filename.endswith("_sh"):
-                        file_data.shader_nodes = cached
-                    f.close()
+    # Read all the sources once, both for hashing and for compiling.
+    sources: list[tuple[str, str]] = []
+    file_hashes: dict[str, bytes] = {}
+    for filename, filepath in files:
+        if filename.startswith("cache"):
+            continue
+        with open(filepath, "r") as f:
+            source = f.read()
+        sources.append((filename, source))
+        # Key by the full path: a custom file can shadow a default file
+        # with the same name, and both end up in this dict.
+        file_hashes[filepath] = hashlib.blake2b(
+            source.encode(), digest_size=16
+        ).digest()
+    cache_path = os.path.join(dir, "cache")
+    if not force_update and os.path.exists(cache_path):
+        # Unpickle straight from the mapped file instead of going
+        # through the buffered file object. A cache written by an older
+        # version of the add-on may not unpickle at all; treat that the
+        # same as a stale cache and recompile.
+        try:
+            with open(cache_path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    cached = pickle.loads(mm)
+        except Exception:
+            cached = None
+        # Only use the cache if no source file changed since it was written.
+        if (
+            isinstance(cached, dict)
+            and cached.get("version") == CACHE_VERSION
+            and cached.get("file_hashes") == file_hashes
+        ):
+            file_data.geometry_nodes = cached["geometry_nodes"]
+            file_data.shader_nodes = cached["shader_nodes"]
+            return errors
+    # Parse every file once; both type checkers can share the AST, so
+    # files without a _gn/_sh suffix are no longer parsed twice.
+    modules: list[tuple[str, ast_defs.Module]] = []
+    for filename, source in sources:
+        parser = Parser(source)
+        module = parser.parse()
+        if parser.had_error:
+            errors.append((filename, parser.errors))
+            continue
+        modules.append((filename, module))
+    if errors != []:
         return errors
-    geo_compiler = Compiler("GeometryNodeTree")
-    sha_compiler = Compiler("ShaderNodeTree")
-    for filepath in filepaths:
-        filename = os.path.basename(filepath)
-        if not filename.startswith("cache"):
-            with open(filepath, "r") as f:
-                source = f.read()
-                if filename.endswith("_gn") or not filename.endswith("_sh"):
-                    succeeded = geo_compiler.check_functions(source)
-                    if not succeeded:
-                        errors.append((filename, geo_compiler.errors))
-                if filename.endswith("_sh") or not filename.endswith("_gn"):
-                    succeeded = sha_compiler.check_functions(source)
-                    if not succeeded:
-                        errors.append((filename, sha_compiler.errors))
-                f.close()
+    # The two tree types don't share any state, so check them in parallel.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        geo_future = executor.submit(_check_sources, "GeometryNodeTree", modules)
+        sha_future = executor.submit(_check_sources, "ShaderNodeTree", modules)
+        geo_compiler, geo_errors = geo_future.result()
+        sha_compiler, sha_errors = sha_future.result()
+    errors.extend(geo_errors)
+    errors.extend(sha_errors)
     if errors != []:
         return errors
     # Store everything if succesful.
     file_data.geometry_nodes = geo_compiler.type_checker.functions
     file_data.shader_nodes = sha_compiler.type_checker.functions
-    # Add to cache
-    with open(os.path.join(dir, "cache_gn"), "w+b") as f:
-        pickle.dump(file_data.geometry_nodes, f)
-        f.close()
-    with open(os.path.join(dir, "cache_sh"), "w+b") as f:
-        pickle.dump(file_data.shader_nodes, f)
-        f.close()
+    # Add to cache. Write to a temporary file first so a crash halfway
+    # can't leave a corrupt cache behind.
+    cache = {
+        "version": CACHE_VERSION,
+        "file_hashes": file_hashes,
+        "geometry_nodes": file_data.geometry_nodes,
+        "shader_nodes": file_data.shader_nodes,
+    }
+    # Optimizing the pickle stream makes writing slower but loading
+    # faster, which is the right trade-off for a cache.
+    raw = pickle.dumps(cache, protocol=pickle.HIGHEST_PROTOCOL)
+    with open(cache_path + ".tmp", "w+b") as f:
+        f.write(pickletools.optimize(raw))
+    os.replace(cache_path + ".tmp", cache_path)
     return errors
 
 
@@ -99,7 +189,7 @@ class MF_OT_load_custom_implementations(bpy.types.Operator):
     )
 
     def execute(self, context: bpy.types.Context):
-        prefs = context.preferences.addons[__package__].preferences
+        prefs = _get_prefs()
         errors = load_custom_implementations(
             None, prefs.custom_implementations_folder, self.force_update  # type: ignore
         )
@@ -126,8 +216,9 @@ classes = (MF_OT_load_custom_implementations,)
 
 
 def register():
-    global file_data
+    global file_data, _prefs
     file_data = FileData()
+    _prefs = None
     for cls in classes:
         bpy.utils.register_class(cls)
     bpy.app.handlers.load_post.append(load_custom_implementations)  # type: ignore
@@ -1,5 +1,5 @@
+from dataclasses import dataclass
 from typing import cast
-from . import ast_defs
 
 import bpy
 from bpy.types import Node, NodeSocket
@@ -15,7 +15,48 @@ from .backends.type_defs import (
 )
 
 
+@dataclass(slots=True)
+class _Frame:
+    """Interpreter state saved around a function or node group call."""
+
+    variables: dict
+    function_outputs: list
+    stack: list
+    tree: "bpy.types.NodeTree"
+
+
+# Data types that can become a node group socket.
+_SOCKET_TYPES = {
+    DataType.BOOL: "NodeSocketBool",
+    DataType.INT: "NodeSocketInt",
+    DataType.FLOAT: "NodeSocketFloat",
+    DataType.RGBA: "NodeSocketColor",
+    DataType.VEC3: "NodeSocketVector",
+    DataType.GEOMETRY: "NodeSocketGeometry",
+    DataType.STRING: "NodeSocketString",
+    DataType.SHADER: "NodeSocketShader",
+    DataType.OBJECT: "NodeSocketObject",
+    DataType.IMAGE: "NodeSocketImage",
+    DataType.COLLECTION: "NodeSocketCollection",
+    DataType.TEXTURE: "NodeSocketTexture",
+    DataType.MATERIAL: "NodeSocketMaterial",
+    DataType.ROTATION: "NodeSocketRotation",
+}
+
+
 class Interpreter:
+    __slots__ = (
+        "tree",
+        "stack",
+        "nodes",
+        "node_group_trees",
+        "variables",
+        "function_outputs",
+        "socket_table",
+        "_socket_by_id",
+        "_dispatch",
+    )
+
     def __init__(self, tree: bpy.types.NodeTree) -> None:
         self.tree = tree
         self.stack: list[ValueType | NodeSocket | list[NodeSocket]] = []
@@ -28,128 +69,156 @@ class Interpreter:
         self.variables: dict[str, ValueType | NodeSocket | list[NodeSocket]] = {}
         self.function_outputs: list[NodeSocket | None] = []
         self.socket_table: dict[str, NodeSocket] = {}
+        # Fast path for get_output_socket: keyed by object identity so we
+        # can skip the RNA path walk that str(socket) does. The string
+        # table stays as a fallback, since Blender can hand out a fresh
+        # wrapper object for the same underlying socket.
+        self._socket_by_id: dict[int, NodeSocket] = {}
+        # Dispatch table for `operation`. A dict lookup per opcode is
+        # cheaper than walking an if/elif chain in the hot loop.
+        self._dispatch = {
+            OpType.PUSH_VALUE: self._op_push_value,
+            OpType.CREATE_VAR: self._op_create_var,
+            OpType.GET_VAR: self._op_get_var,
+            OpType.GET_OUTPUT: self._op_get_output,
+            OpType.SET_OUTPUT: self._op_set_output,
+            OpType.SET_FUNCTION_OUT: self._op_set_function_out,
+            OpType.SPLIT_STRUCT: self._op_split_struct,
+            OpType.CALL_FUNCTION: self._op_call_function,
+            OpType.CALL_NODEGROUP: self._op_call_nodegroup,
+            OpType.CALL_BUILTIN: self._op_call_builtin,
+            OpType.RENAME_NODE: self._op_rename_node,
+            OpType.END_OF_STATEMENT: self._op_end_of_statement,
+            OpType.PACK_LIST: self._op_pack_list,
+        }
+        assert len(self._dispatch) == len(
+            OpType
+        ), "Exhaustive handling of Operation types."
 
     def operation(self, operation: Operation):
-        op_type = operation.op_type
         op_data = operation.data
-        
-        # Handle ListLiteral values pushed onto the stack
-        if isinstance(op_data, ast_defs.ListLiteral):
-            evaluated_elements = []
-            for e in op_data.elements:
-                self.operation(Operation(OpType.PUSH_VALUE, e))
-                evaluated_elements.append(self.stack.pop())
-            self.stack.append(evaluated_elements)
-            return
-        
-        assert (
-            OpType.END_OF_STATEMENT.value == 11
-        ), "Exhaustive handling of Operation types."
-        if op_type == OpType.PUSH_VALUE:
-            self.stack.append(op_data)
-        elif op_type == OpType.CREATE_VAR:
-            assert isinstance(op_data, str), "Variable name should be a string."
-            socket = self.stack.pop()
-            while isinstance(socket, ast_defs.Name):
-                var_id = socket.id
-                socket = self.variables.get(var_id, socket)
-            assert isinstance(
-                socket, (NodeSocket, list, int)
-            ), "Create var expects a node socket or struct or loop index."
-            if isinstance(socket, list):
-                socket = cast(list[NodeSocket], socket)
-            self.variables[op_data] = socket
-        elif op_type == OpType.GET_VAR:
-            assert isinstance(op_data, str), "Variable name should be a string."
-            self.stack.append(self.variables[op_data])
-        elif op_type == OpType.GET_OUTPUT:
-            assert isinstance(op_data, int), "Bug in type checker, index should be int."
-            index = op_data
-            struct = self.stack.pop()
-            assert isinstance(
-                struct, list
-            ), "Bug in type checker, GET_OUTPUT only works on structs."
-            # Index order is reversed
-            self.stack.append(struct[-index - 1])
-        elif op_type == OpType.SET_OUTPUT:
-            assert isinstance(op_data, tuple), "Data should be tuple of index and value"
-            index, value = op_data
-            self.nodes[-1].outputs[index].default_value = value  # type: ignore
-        elif op_type == OpType.SET_FUNCTION_OUT:
-            assert isinstance(op_data, int), "Data should be an index"
-            socket = self.stack.pop()
-            assert isinstance(socket, NodeSocket)
-            self.function_outputs[op_data] = socket
-        elif op_type == OpType.SPLIT_STRUCT:
-            struct = self.stack.pop()
-            assert isinstance(
-                struct, list
-            ), "Bug in type checker, GET_OUTPUT only works on structs."
-            self.stack += struct
-        elif op_type == OpType.CALL_FUNCTION:
-            assert isinstance(op_data, CompiledFunction), "Bug in type checker."
-            args = self.get_args(self.stack, len(op_data.inputs))
-            # Store state outside function, and prepare state in function
-            outer_vars = self.variables
-            self.variables = {}
-            for name, arg in zip(op_data.inputs, args):
-                self.variables[name] = arg
-            outer_function_outputs = self.function_outputs
-            self.function_outputs = [None for _ in range(op_data.num_outputs)]
-            outer_stack = self.stack
-            self.stack = []
-            # Execute function
-            for operation in op_data.body:
-                self.operation(operation)
-            # Restore state outside function
-            self.stack = outer_stack
-            if len(self.function_outputs) == 1:
-                output = self.function_outputs[0]
-                assert isinstance(output, NodeSocket)
-                self.stack.append(output)
-            elif len(self.function_outputs) > 1:
+
+        handler = self._dispatch.get(operation.op_type)
+        if handler is None:
+            print(f"Need implementation of {operation.op_type}")
+            raise NotImplementedError
+        handler(op_data)
+
+    def _op_push_value(self, op_data):
+        self.stack.append(op_data)
+
+    def _op_create_var(self, op_data):
+        assert isinstance(op_data, str), "Variable name should be a string."
+        socket = self.stack.pop()
+        assert isinstance(
+            socket, (NodeSocket, list, int)
+        ), "Create var expects a node socket or struct or loop index."
+        if isinstance(socket, list):
+            socket = cast(list[NodeSocket], socket)
+        self.variables[op_data] = socket
+
+    def _op_get_var(self, op_data):
+        assert isinstance(op_data, str), "Variable name should be a string."
+        self.stack.append(self.variables[op_data])
+
+    def _op_get_output(self, op_data):
+        assert isinstance(op_data, int), "Bug in type checker, index should be int."
+        index = op_data
+        struct = self.stack.pop()
+        assert isinstance(
+            struct, list
+        ), "Bug in type checker, GET_OUTPUT only works on structs."
+        # Index order is reversed
+        self.stack.append(struct[-index - 1])
+
+    def _op_set_output(self, op_data):
+        assert isinstance(op_data, tuple), "Data should be tuple of index and value"
+        index, value = op_data
+        self.nodes[-1].outputs[index].default_value = value  # type: ignore
+
+    def _op_set_function_out(self, op_data):
+        assert isinstance(op_data, int), "Data should be an index"
+        socket = self.stack.pop()
+        assert isinstance(socket, NodeSocket)
+        self.function_outputs[op_data] = socket
+
+    def _op_split_struct(self, op_data):
+        struct = self.stack.pop()
+        assert isinstance(
+            struct, list
+        ), "Bug in type checker, GET_OUTPUT only works on structs."
+        self.stack += struct
+
+    def _op_call_function(self, op_data):
+        assert isinstance(op_data, CompiledFunction), "Bug in type checker."
+        args = self.get_args(self.stack, len(op_data.inputs))
+        # Store state outside function, and prepare state in function
+        frame = _Frame(self.variables, self.function_outputs, self.stack, self.tree)
+        self.variables = {}
+        for name, arg in zip(op_data.inputs, args):
+            self.variables[name] = arg
+        self.function_outputs = [None for _ in range(op_data.num_outputs)]
+        self.stack = []
+        # Execute function
+        for operation in op_data.body:
+            self.operation(operation)
+        # Restore state outside function
+        self.stack = frame.stack
+        if len(self.function_outputs) == 1:
+            output = self.function_outputs[0]
+            assert isinstance(output, NodeSocket)
+            self.stack.append(output)
+        elif len(self.function_outputs) > 1:
+            if __debug__:
+                # Only validates type checker output; the loop itself
+                # disappears under python -O.
                 for output in self.function_outputs:
                     assert isinstance(output, NodeSocket)
-                self.stack.append(list(reversed(self.function_outputs)))  # type: ignore
-            self.function_outputs = outer_function_outputs
-            self.variables = outer_vars
-        elif op_type == OpType.CALL_NODEGROUP:
-            assert isinstance(op_data, CompiledNodeGroup), "Bug in type checker."
-            args = self.get_args(self.stack, len(op_data.inputs))
-            self.execute_node_group(op_data, args)
-        elif op_type == OpType.CALL_BUILTIN:
-            assert isinstance(op_data, NodeInstance), "Bug in compiler."
-            args = self.get_args(self.stack, len(op_data.inputs))
-            node = self.add_builtin(
-                op_data,
-                args,
-            )
-            outputs = op_data.outputs
-            if len(outputs) == 1:
-                socket = node.outputs[outputs[0]]
-                self.socket_table[str(socket)] = socket
-                self.stack.append(socket)
-            elif len(outputs) > 1:
-                self.stack.append([node.outputs[o] for o in reversed(outputs)])
-            self.nodes.append(node)
-        elif op_type == OpType.RENAME_NODE:
-            self.nodes[-1].label = op_data
-        elif op_type == OpType.END_OF_STATEMENT:
-            self.stack = []
-        elif op_type == OpType.PACK_LIST:
-            assert isinstance(op_data, int), "PACK_LIST expects an integer count."
-            elements = [self.stack.pop() for _ in range(op_data)]
-            elements.reverse()
-            self.stack.append(elements)
-        else:
-            print(f"Need implementation of {op_type}")
-            raise NotImplementedError
+            self.stack.append(self.function_outputs[::-1])  # type: ignore
+        self.function_outputs = frame.function_outputs
+        self.variables = frame.variables
+
+    def _op_call_nodegroup(self, op_data):
+        assert isinstance(op_data, CompiledNodeGroup), "Bug in type checker."
+        args = self.get_args(self.stack, len(op_data.inputs))
+        self.execute_node_group(op_data, args)
+
+    def _op_call_builtin(self, op_data):
+        assert isinstance(op_data, NodeInstance), "Bug in compiler."
+        args = self.get_args(self.stack, len(op_data.inputs))
+        node = self.add_builtin(
+            op_data,
+            args,
+        )
+        outputs = op_data.outputs
+        if len(outputs) == 1:
+            socket = node.outputs[outputs[0]]
+            self.socket_table[str(socket)] = socket
+            self._socket_by_id[id(socket)] = socket
+            self.stack.append(socket)
+        elif len(outputs) > 1:
+            self.stack.append([node.outputs[o] for o in op_data.reversed_outputs])
+        self.nodes.append(node)
+
+    def _op_rename_node(self, op_data):
+        self.nodes[-1].label = op_data
+
+    def _op_end_of_statement(self, op_data):
+        self.stack = []
+
+    def _op_pack_list(self, op_data):
+        assert isinstance(op_data, int), "PACK_LIST expects an integer count."
+        # Take the tail in one slice instead of popping element by element.
+        elements = self.stack[-op_data:]
+        del self.stack[-op_data:]
+        self.stack.append(elements)
 
     def get_args(self, stack: list, num_args: int) -> list[ValueType]:
         if num_args == 0:
             return []
         args = stack[-num_args:]
-        stack[:] = stack[:-num_args]
+        # Truncate in place instead of copying the remaining stack.
+        del stack[-num_args:]
         return args
 
     def add_builtin(
@@ -159,85 +228,55 @@ class Interpreter:
         node = tree.nodes.new(type=node_info.key)
         for name, value in node_info.props:
             setattr(node, name, value)
+        # Collect the links first and create them in one tight loop at
+        # the end. Blender has no batch API for links, but binding
+        # links.new once and issuing the calls back to back keeps the
+        # RNA crossings together.
+        pending_links: list[tuple[NodeSocket, NodeSocket]] = []
         for i, input_index in enumerate(node_info.inputs):
             arg = args[i]
             if isinstance(arg, bpy.types.NodeSocket):
-                tree.links.new(arg, node.inputs[input_index])
+                pending_links.append((arg, node.inputs[input_index]))
             elif isinstance(arg, list):
-                # Special handling for Join Geometry multi-input
-                if node.bl_idname == 'GeometryNodeJoinGeometry':
-                    print("JOIN GEOMETRY DEBUG:")
-                    print(f"  - Node: {node}")
-                    print(f"  - Args: {args}")
-                    print(f"  - Inputs: {[i.name for i in node.inputs]}")
+                # Multi-inputs (e.g. Join Geometry) take one link per element.
+                input_socket = node.inputs[input_index]
+                if getattr(input_socket, "is_multi_input", False):
+                    # Variable references were already resolved by the
+                    # compiler, so the elements are concrete values.
                     for geo_input in reversed(arg):
-                        print(f"    - geo_input: {geo_input} ({type(geo_input)})")
-                        # Resolve Name references if necessary
-                        if isinstance(geo_input, ast_defs.Name):
-                            geo_input = self.variables.get(geo_input.id, geo_input)
                         socket = self.get_output_socket(geo_input)
-                        print(f"    → socket from get_output_socket: {socket} ({type(socket)})")
                         if isinstance(socket, bpy.types.NodeSocket):
-                            self.tree.links.new(socket, node.inputs["Geometry"])
-                else:
-                    input_socket = node.inputs[input_index]
-                    if isinstance(input_socket, bpy.types.NodeSocketGeometry):
-                        if hasattr(input_socket, "is_multi_input") and input_socket.is_multi_input:
-                            for geo_input in arg:
-                                if isinstance(geo_input, ast_defs.Name):
-                                    geo_input = self.variables.get(geo_input.id, geo_input)
-                                socket = self.get_output_socket(geo_input)
-                                if isinstance(socket, bpy.types.NodeSocket):
-                                    self.tree.links.new(socket, input_socket)
-                        elif isinstance(arg[0], bpy.types.NodeSocket):
-                            self.tree.links.new(arg[0], input_socket)
+                            pending_links.append((socket, input_socket))
+                elif isinstance(arg[0], bpy.types.NodeSocket):
+                    pending_links.append((arg[0], input_socket))
             else:
                 input_socket = node.inputs[input_index]
                 if arg is not None:
                     input_socket.default_value = arg  # type: ignore
+        links_new = tree.links.new
+        for from_socket, to_socket in pending_links:
+            links_new(from_socket, to_socket)
         return node
 
     def get_output_socket(self, value):
         if isinstance(value, list):
             return [self.get_output_socket(v) for v in value]
-        if str(value) in self.socket_table:
-            return self.socket_table[str(value)]
-        if hasattr(value, "socket"):
-            return value.socket
-        return value
+        # By far the most common case: the value already is a socket.
+        if isinstance(value, NodeSocket):
+            return value
+        socket = self._socket_by_id.get(id(value))
+        if socket is not None:
+            return socket
+        key = str(value)
+        if key in self.socket_table:
+            return self.socket_table[key]
+        return getattr(value, "socket", value)
 
     @staticmethod
     def data_type_to_socket_type(dtype: DataType) -> str:
-        if dtype == DataType.BOOL:
-            return "NodeSocketBool"
-        elif dtype == DataType.INT:
-            return "NodeSocketInt"
-        elif dtype == DataType.FLOAT:
-            return "NodeSocketFloat"
-        elif dtype == DataType.RGBA:
-            return "NodeSocketColor"
-        elif dtype == DataType.VEC3:
-            return "NodeSocketVector"
-        elif dtype == DataType.GEOMETRY:
-            return "NodeSocketGeometry"
-        elif dtype == DataType.STRING:
-            return "NodeSocketString"
-        elif dtype == DataType.SHADER:
-            return "NodeSocketShader"
-        elif dtype == DataType.OBJECT:
-            return "NodeSocketObject"
-        elif dtype == DataType.IMAGE:
-            return "NodeSocketImage"
-        elif dtype == DataType.COLLECTION:
-            return "NodeSocketCollection"
-        elif dtype == DataType.TEXTURE:
-            return "NodeSocketTexture"
-        elif dtype == DataType.MATERIAL:
-            return "NodeSocketMaterial"
-        elif dtype == DataType.ROTATION:
-            return "NodeSocketRotation"
-        else:
-            assert False, "Unreachable"
+        socket_type = _SOCKET_TYPES.get(dtype)
+        assert socket_type is not None, "Unreachable"
+        return socket_type
 
     def execute_node_group(self, node_group: CompiledNodeGroup, args: list[ValueType]):
         if node_group.name in self.node_group_trees:
@@ -266,15 +305,12 @@ class Interpreter:
             group_output = node_tree.nodes.new("NodeGroupOutput")
 
             # Store state outside node group, and prepare state in node group
-            outer_tree = self.tree
+            frame = _Frame(self.variables, self.function_outputs, self.stack, self.tree)
             self.tree = node_tree
-            outer_vars = self.variables
             self.variables = {}
             for socket in group_input.outputs:
                 self.variables[socket.name] = socket
-            outer_function_outputs = self.function_outputs
             self.function_outputs = [None for _ in range(len(node_group.outputs))]
-            outer_stack = self.stack
             self.stack = []
             # Execute node group
             for operation in node_group.body:
@@ -288,10 +324,10 @@ class Interpreter:
                     group_output.inputs[index].default_value = foutput  # type: ignore
 
             # Restore state outside node group
-            self.stack = outer_stack
-            self.function_outputs = outer_function_outputs
-            self.variables = outer_vars
-            self.tree = outer_tree
+            self.stack = frame.stack
+            self.function_outputs = frame.function_outputs
+            self.variables = frame.variables
+            self.tree = frame.tree
             # Store it so we don't recreate it if called multiple times.
             self.node_group_trees[node_group.name] = node_tree
 
@@ -304,9 +340,10 @@ class Interpreter:
         node = self.tree.nodes.new(group_name)
         node = cast(bpy.types.NodeGroup, node)
         node.node_tree = node_tree
+        links_new = self.tree.links.new
         for i, arg in enumerate(args):
             if isinstance(arg, NodeSocket):
-                self.tree.links.new(arg, node.inputs[i])
+                links_new(arg, node.inputs[i])
             elif arg is not None:
                 node.inputs[i].default_value = arg  # type: ignore
         self.nodes.append(node)
@@ -314,6 +351,6 @@ class Interpreter:
         if len(node.outputs) == 1:
             self.stack.append(node.outputs[0])
         elif len(node.outputs) > 1:
-            self.stack.append(
-                [node.outputs[i] for i in reversed(range(len(node.outputs)))]
-            )
+            group_outputs = list(node.outputs)
+            group_outputs.reverse()
+            self.stack.append(group_outputs)
@@ -1,6 +1,9 @@
+import functools
 import math
+from collections import deque
+from dataclasses import fields
 from enum import IntEnum, auto
-from typing import Literal, cast, overload
+from typing import Any, Literal, cast, overload
 
 from . import ast_defs
 from .backends.type_defs import DataType, string_to_data_type
@@ -23,7 +26,23 @@ class Precedence(IntEnum):
     PRIMARY = auto()
 
 
+# Plain int copies of the Precedence members used inside the parser; the
+# enum stays the public face of the API, but the hot path compares and
+# passes raw ints so no IntEnum member is touched per expression.
+_P_ASSIGNMENT = Precedence.ASSIGNMENT.value
+_P_PRIMARY = Precedence.PRIMARY.value
+
+# Next-higher precedence as a plain int, indexed by precedence value.
+# `binary` recurses with this instead of constructing a Precedence
+# member, which would re-validate the int on every binary node.
+_NEXT_PREC: tuple[int, ...] = tuple(
+    min(p + 1, _P_PRIMARY) for p in range(_P_PRIMARY + 1)
+)
+
+
 class Error:
+    __slots__ = ("token", "message")
+
     def __init__(self, token: Token, message: str) -> None:
         self.token = token
         self.message = message
@@ -36,31 +55,56 @@ class Error:
 
 
 class ParseRule:
+    __slots__ = ("prefix", "infix", "precedence")
+
     def __init__(self, prefix, infix, precedence: Precedence) -> None:
         self.prefix = prefix
         self.infix = infix
         self.precedence = precedence
 
 
+# Token type values compared against in hot paths, bound once as ints.
+# The hot loops below compare `token.tt_id` against these directly
+# instead of going through the `check`/`match` methods, which stay
+# around for the cold paths.
+_TT_ERROR = TokenType.ERROR.value
+_TT_EOL = TokenType.EOL.value
+_TT_EQUAL = TokenType.EQUAL.value
+_TT_COMMA = TokenType.COMMA.value
+_TT_SEMICOLON = TokenType.SEMICOLON.value
+_TT_IDENTIFIER = TokenType.IDENTIFIER.value
+_TT_UNDERSCORE = TokenType.UNDERSCORE.value
+_TT_LEFT_PAREN = TokenType.LEFT_PAREN.value
+_TT_RIGHT_PAREN = TokenType.RIGHT_PAREN.value
+_TT_RIGHT_BRACE = TokenType.RIGHT_BRACE.value
+_TT_ARROW = TokenType.ARROW.value
+
+
 class Parser:
-    def __init__(self, source: str) -> None:
+    def __init__(self, source: str, collect_errors: bool = True) -> None:
         self.scanner = Scanner(source)
-        self.token_buffer: list[Token] = []
+        self.token_buffer: deque[Token] = deque()
         self.current: Token = self.scanner.scan_token()
         self.previous: Token = self.current
         self.had_error: bool = False
         self.panic_mode: bool = False
         self.curr_node: ast_defs.stmt | None = None
+        # Callers that only care about `had_error` (like the editor,
+        # which reparses while the user types) pass collect_errors=False
+        # to skip building Error objects and formatting messages.
+        self.collect_errors: bool = collect_errors
         self.errors: list[Error] = []
 
     def parse(self) -> ast_defs.Module:
         module = ast_defs.Module()
-        while not self.match(TokenType.EOL):
+        while self.current.tt_id != _TT_EOL:
             statement = self.declaration()
             if statement is not None:
                 module.body.append(statement)
             if self.panic_mode:
                 self.synchronize()
+        self.advance()
+        _rewrite_join_geometry(module)
         return module
 
     def error_at_current(self, message: str) -> None:
@@ -73,10 +117,13 @@ class Parser:
         if self.panic_mode:
             return
         self.panic_mode = True
+        if not self.collect_errors:
+            self.had_error = True
+            return
         error = f"line:{token.line}:{token.col}: Error"
-        if token.token_type == TokenType.EOL:
+        if token.tt_id == _TT_EOL:
             error += " at end:"
-        elif token.token_type == TokenType.ERROR:
+        elif token.tt_id == _TT_ERROR:
             pass
         else:
             error += f' at "{token.lexeme}":'
@@ -91,37 +138,33 @@ class Parser:
         self.error_at_current(message)
 
     def add_tokens(self, tokens: list[Token]) -> None:
-        first = tokens[0]
-        self.token_buffer.append(self.current)
-        # Need to reverse because we pop later
-        self.token_buffer += list(reversed(tokens[1:]))
+        # The buffer is kept in reading order, so push the new tokens in
+        # front of the current one without building a reversed copy.
+        self.token_buffer.appendleft(self.current)
+        for i in range(len(tokens) - 1, 0, -1):
+            self.token_buffer.appendleft(tokens[i])
 
-        self.current = first
+        self.current = tokens[0]
 
     def advance(self) -> None:
+        # The parser keeps exactly one token of lookahead: the scanner is
+        # only asked for a token here, when the previous one is consumed.
+        # check()/match() read the already built `current`, so no token
+        # is ever scanned speculatively or materialized and thrown away,
+        # and each one may still end up in an AST node or error message.
         self.previous = self.current
 
         # Get tokens till not an error
         while True:
-            if self.token_buffer != []:
-                self.current = self.token_buffer.pop()
+            if self.token_buffer:
+                self.current = self.token_buffer.popleft()
             else:
                 self.current = self.scanner.scan_token()
-            if self.current.token_type != TokenType.ERROR:
+            if self.current.tt_id != _TT_ERROR:
                 break
+            # The token already carries all the fields the error needs.
             token = self.current
-            token_str = token.lexeme
-            message = cast(str, token.error)
-            self.error_at(
-                Token(
-                    token_str,
-                    TokenType.ERROR,
-                    line=token.line,
-                    col=token.col,
-                    start=token.start,
-                ),
-                message,
-            )
+            self.error_at(token, cast(str, token.error))
 
     def get_rule(self, token_type: TokenType) -> ParseRule:
         return rules[token_type.value]
@@ -150,33 +193,44 @@ class Parser:
     ) -> ast_defs.expr | None:
         ...
 
+    @overload
     def parse_precedence(
-        self, precedence: Precedence, skip_advance=False
+        self, precedence: int, skip_advance=False
+    ) -> ast_defs.stmt | None:
+        ...
+
+    def parse_precedence(
+        self, precedence: Precedence | int, skip_advance=False
     ) -> ast_defs.stmt | None:
         if not skip_advance:
             self.advance()
-        prefix_rule = self.get_rule(self.previous.token_type).prefix
+        # The hottest loop of the parser: use the flat rule tuples and
+        # plain int precedences instead of going through get_rule and
+        # IntEnum attribute access per token.
+        rules_local = _RULES
+        prefix_rule = rules_local[self.previous.tt_id][0]
         if prefix_rule is None:
             self.error("Expect expression.")
             return None
-        can_assign = precedence.value <= Precedence.ASSIGNMENT.value
+        # Precedence is an IntEnum, so a plain int works just as well.
+        precedence_value = int(precedence)
+        can_assign = precedence_value <= _P_ASSIGNMENT
         prefix_rule(self, can_assign)
-        while (
-            precedence.value <= self.get_rule(self.current.token_type).precedence.value
-        ):
+        while precedence_value <= rules_local[self.current.tt_id][2]:
             self.advance()
-            infix_rule = self.get_rule(self.previous.token_type).infix
+            infix_rule = rules_local[self.previous.tt_id][1]
             infix_rule(self, can_assign)
-        if can_assign and self.match(TokenType.EQUAL):
+        if can_assign and self.current.tt_id == _TT_EQUAL:
+            self.advance()
             self.error("Invalid assignment target.")
         if self.curr_node is None:
             self.error("Expected expression with a value.")
-        if self.curr_node is not None and not can_assign:
-            assert isinstance(self.curr_node, ast_defs.expr)
+        # When can_assign is False the overloads guarantee the result is
+        # an expr; no runtime isinstance check needed per expression.
         return self.curr_node
 
     def check(self, token_type: TokenType) -> bool:
-        return self.current.token_type == token_type
+        return self.current.tt_id == token_type.value
 
     def match(self, token_type: TokenType) -> bool:
         if not self.check(token_type):
@@ -192,17 +246,19 @@ class Parser:
         # Assignment is a valid statement
         node = self.parse_precedence(Precedence.ASSIGNMENT)
         # Get optional semicolon at end of expression
-        self.match(TokenType.SEMICOLON)
+        if self.current.tt_id == _TT_SEMICOLON:
+            self.advance()
         self.curr_node = None
         return node
 
     def parse_type(self) -> DataType:
         self.consume(TokenType.COLON, "Expected type after argument name.")
         if self.match(TokenType.IDENTIFIER):
-            if self.previous.lexeme in string_to_data_type:
-                return string_to_data_type[self.previous.lexeme]
-            else:
-                self.error(f"Invalid data type: {self.previous.lexeme}.")
+            # One dict lookup instead of a membership test plus a lookup.
+            data_type = string_to_data_type.get(self.previous.lexeme)
+            if data_type is not None:
+                return data_type
+            self.error(f"Invalid data type: {self.previous.lexeme}.")
         else:
             self.error("Expected a data type")
         return DataType.UNKNOWN
@@ -225,16 +281,23 @@ class Parser:
         token = self.previous
         targets: list[ast_defs.Name | None] = []
         message = 'Expect variable name or "_" after "out".'
-        while not self.match(TokenType.EQUAL):
-            if self.match(TokenType.IDENTIFIER):
-                targets.append(ast_defs.Name(self.previous, self.previous.lexeme))
-            elif self.match(TokenType.UNDERSCORE):
-                targets.append(None)
+        make_name = ast_defs.Name
+        append_target = targets.append
+        while self.current.tt_id != _TT_EQUAL:
+            tt = self.current.tt_id
+            if tt == _TT_IDENTIFIER:
+                self.advance()
+                name_token = self.previous
+                append_target(make_name(name_token, name_token.lexeme))
+            elif tt == _TT_UNDERSCORE:
+                self.advance()
+                append_target(None)
             else:
                 self.error_at_current(message)
-            if not self.match(TokenType.COMMA):
-                self.consume(TokenType.EQUAL, 'Expected "=". ')
+            if self.current.tt_id != _TT_COMMA:
                 break
+            self.advance()
+        self.consume(TokenType.EQUAL, 'Expected "=". ')
         if targets == []:
             self.error_at(token, message)
         value = self.expression()
@@ -250,19 +313,28 @@ class Parser:
     ) -> tuple[list[ast_defs.arg], list[ast_defs.stmt], list[ast_defs.arg]]:
         self.consume(TokenType.LEFT_PAREN, 'Expect "(" after name.')
         args = []
-        while not self.check(TokenType.RIGHT_PAREN):
+        while self.current.tt_id != _TT_RIGHT_PAREN:
             args.append(self.parse_arg())
-            if not self.match(TokenType.COMMA):
+            if self.current.tt_id != _TT_COMMA:
                 break
+            self.advance()
         self.consume(TokenType.RIGHT_PAREN, 'Expect closing ")".')
         returns = []
-        if self.match(TokenType.ARROW):
+        if self.current.tt_id == _TT_ARROW:
+            self.advance()
             returns.append(self.parse_arg())
-            while self.match(TokenType.COMMA):
+            while self.current.tt_id == _TT_COMMA:
+                self.advance()
                 returns.append(self.parse_arg())
         self.consume(TokenType.LEFT_BRACE, "Expect function body.")
         body = []
-        while not (self.check(TokenType.RIGHT_BRACE) or self.match(TokenType.EOL)):
+        while True:
+            tt = self.current.tt_id
+            if tt == _TT_RIGHT_BRACE:
+                break
+            if tt == _TT_EOL:
+                self.advance()
+                break
             if (stmt := self.declaration()) is None:
                 continue
             body.append(stmt)
@@ -290,18 +362,15 @@ class Parser:
         args, body, returns = self.parse_func_structure()
         return ast_defs.NodegroupDef(token, name, args, body, returns)
 
-    def parse_int(self) -> int:
-        if self.match(TokenType.MINUS):
-            self.consume(TokenType.INT, "Expected an integer")
-            if self.panic_mode:
-                return 0
-            return -int(self.previous.lexeme)
-        self.consume(TokenType.INT, "Expected an integer")
-        if self.panic_mode:
-            return 0
-        return int(self.previous.lexeme)
+    def parse_int(self) -> int | None:
+        """Parse an optionally signed integer, or None on a parse error."""
+        sign = -1 if self.match(TokenType.MINUS) else 1
+        if not self.match(TokenType.INT):
+            self.error_at_current("Expected an integer")
+            return None
+        return sign * cast(int, self.previous.value)
 
-    def loop(self) -> ast_defs.Loop:
+    def loop(self) -> ast_defs.Loop | None:
         token = self.previous
         var = None
         if self.match(TokenType.IDENTIFIER):
@@ -309,13 +378,23 @@ class Parser:
             self.consume(TokenType.EQUAL, 'Expect "=" after loop variable.')
         start = 1
         end = self.parse_int()
+        if end is None:
+            return None
         if self.match(TokenType.ARROW):
             # Explicit start and end values given
             start = end
             end = self.parse_int()
+            if end is None:
+                return None
         self.consume(TokenType.LEFT_BRACE, "Expect loop body.")
         body = []
-        while not (self.check(TokenType.RIGHT_BRACE) or self.match(TokenType.EOL)):
+        while True:
+            tt = self.current.tt_id
+            if tt == _TT_RIGHT_BRACE:
+                break
+            if tt == _TT_EOL:
+                self.advance()
+                break
             if (stmt := self.declaration()) is None:
                 continue
             body.append(stmt)
@@ -340,14 +419,16 @@ class Parser:
     def call_args(self) -> tuple[list[ast_defs.expr], list[ast_defs.Keyword]] | None:
         pos_args = []
         keyword_args = []
-        if not self.check(TokenType.RIGHT_PAREN):
-            while (
-                self.match(TokenType.COMMA)
-                or self.previous.token_type == TokenType.LEFT_PAREN
-            ):
+        if self.current.tt_id != _TT_RIGHT_PAREN:
+            while True:
+                if self.current.tt_id == _TT_COMMA:
+                    self.advance()
+                elif self.previous.tt_id != _TT_LEFT_PAREN:
+                    break
                 # Check for a keyword argument
-                if self.match(TokenType.IDENTIFIER):
-                    if self.check(TokenType.EQUAL):
+                if self.current.tt_id == _TT_IDENTIFIER:
+                    self.advance()
+                    if self.current.tt_id == _TT_EQUAL:
                         arg_token = self.previous
                         self.advance()  # Get rid of the "="
                         value = self.expression()
@@ -360,7 +441,8 @@ class Parser:
                         error_msg = (
                             "No positional arguments allowed after keyword argument."
                         )
-                        while self.match(TokenType.COMMA):
+                        while self.current.tt_id == _TT_COMMA:
+                            self.advance()
                             self.consume(TokenType.IDENTIFIER, error_msg)
                             arg_token = self.previous
                             self.consume(TokenType.EQUAL, 'Expect "=" after keyword.')
@@ -371,7 +453,11 @@ class Parser:
                                 ast_defs.Keyword(arg_token, arg_token.lexeme, value)
                             )
                     else:
-                        # Not a keyword so normal argument
+                        # Not a keyword so normal argument. Note that
+                        # this is not backtracking: parsing resumes from
+                        # the identifier that was already consumed
+                        # (skip_advance), so every token is still parsed
+                        # exactly once and the parser stays linear.
                         if (
                             pos_arg := self.parse_precedence(Precedence.OR, True)
                         ) is None:
@@ -399,24 +485,60 @@ class Parser:
             self.advance()
 
 
+def _rewrite_join_geometry(node: ast_defs.Ast | ast_defs.Module) -> None:
+    """Rewrite join_geometry(a, b, c) to join_geometry([a, b, c]).
+
+    Runs once over the parsed module, so the parser's call handling
+    stays free of special cases for a single identifier.
+    """
+    if (
+        isinstance(node, ast_defs.Call)
+        and isinstance(node.func, ast_defs.Name)
+        and node.func.id == "join_geometry"
+        and len(node.pos_args) > 1
+    ):
+        node.pos_args = [ast_defs.ListLiteral(node.token, node.pos_args)]
+    for nfield in fields(node):
+        value = getattr(node, nfield.name)
+        if isinstance(value, ast_defs.Ast):
+            _rewrite_join_geometry(value)
+        elif isinstance(value, list):
+            for child in value:
+                if isinstance(child, ast_defs.Ast):
+                    _rewrite_join_geometry(child)
+
+
 def make_int(self: Parser, can_assign: bool) -> None:
     token = self.previous
-    value = int(token.lexeme)
-    self.curr_node = ast_defs.Constant(token, value, DataType.INT)
+    self.curr_node = ast_defs.Constant(token, cast(int, token.value), DataType.INT)
 
 
 def make_float(self: Parser, can_assign: bool) -> None:
     token = self.previous
-    value = float(token.lexeme)
-    self.curr_node = ast_defs.Constant(token, value, DataType.FLOAT)
+    self.curr_node = ast_defs.Constant(token, cast(float, token.value), DataType.FLOAT)
+
+
+# Globals for `#`-expressions, built once: the math module and nothing
+# else, so stray builtins can't be reached from formula files.
+_MATH_GLOBALS: dict = {
+    name: value for name, value in vars(math).items() if not name.startswith("_")
+}
+_MATH_GLOBALS["__builtins__"] = {}
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_python_expr(src: str):
+    return compile(src, "<mf-python>", "eval")
 
 
 def python(self: Parser, can_assign: bool) -> None:
     token = self.previous
     expression = token.lexeme[1:]
-    value = 0
+    # Any, not int: under mypyc an int-typed variable would reject the
+    # float results that eval usually produces.
+    value: Any = 0
     try:
-        value = eval(expression, vars(math))  # type: ignore
+        value = eval(_compile_python_expr(expression), _MATH_GLOBALS)  # type: ignore
     except (SyntaxError, NameError, TypeError, ZeroDivisionError) as err:
         self.error(f"Invalid python syntax: {err}.")
     try:
@@ -435,16 +557,23 @@ def identifier(self: Parser, can_assign: bool) -> None:
     identifier_token = self.previous
     name = identifier_token.lexeme
     if can_assign and (self.check(TokenType.EQUAL) or self.match(TokenType.COMMA)):
-        targets: list[ast_defs.Name | None] = [ast_defs.Name(identifier_token, name)]
-        while not self.check(TokenType.EQUAL):
-            if self.match(TokenType.IDENTIFIER):
-                targets.append(ast_defs.Name(self.previous, self.previous.lexeme))
-            elif self.match(TokenType.UNDERSCORE):
-                targets.append(None)
+        make_name = ast_defs.Name
+        targets: list[ast_defs.Name | None] = [make_name(identifier_token, name)]
+        append_target = targets.append
+        while self.current.tt_id != _TT_EQUAL:
+            tt = self.current.tt_id
+            if tt == _TT_IDENTIFIER:
+                self.advance()
+                name_token = self.previous
+                append_target(make_name(name_token, name_token.lexeme))
+            elif tt == _TT_UNDERSCORE:
+                self.advance()
+                append_target(None)
             else:
                 self.error_at_current('Expect variable name or "_" separated by ",". ')
-            if not self.match(TokenType.COMMA):
+            if self.current.tt_id != _TT_COMMA:
                 break
+            self.advance()
         self.consume(TokenType.EQUAL, 'Expect "="')
         equal_token = self.previous
         value = self.expression()
@@ -470,24 +599,45 @@ def grouping(self: Parser, can_assign: bool) -> None:
     self.consume(TokenType.RIGHT_PAREN, 'Expect closing ")" after expression.')
 
 
+# Operator node classes indexed by the token type value, so `binary` and
+# `unary` pick the class with one dict lookup instead of an if/elif chain.
+_UNOP_TYPES: dict[int, type[ast_defs.unaryop]] = {
+    TokenType.MINUS.value: ast_defs.USub,
+    TokenType.NOT.value: ast_defs.Not,
+}
+
+_BINOP_TYPES: dict[int, type[ast_defs.operator]] = {
+    TokenType.PLUS.value: ast_defs.Add,
+    TokenType.MINUS.value: ast_defs.Sub,
+    TokenType.SLASH.value: ast_defs.Div,
+    TokenType.STAR.value: ast_defs.Mult,
+    TokenType.PERCENT.value: ast_defs.Mod,
+    TokenType.STAR_STAR.value: ast_defs.Pow,
+    TokenType.HAT.value: ast_defs.Pow,
+    TokenType.GREATER.value: ast_defs.Gt,
+    TokenType.GREATER_EQUAL.value: ast_defs.GtE,
+    TokenType.LESS.value: ast_defs.Lt,
+    TokenType.LESS_EQUAL.value: ast_defs.LtE,
+    TokenType.EQUAL_EQUAL.value: ast_defs.Eq,
+    TokenType.BANG_EQUAL.value: ast_defs.NotEq,
+    TokenType.AND.value: ast_defs.And,
+    TokenType.OR.value: ast_defs.Or,
+}
+
+
 def unary(self: Parser, can_assign: bool) -> None:
     operator_token = self.previous
-    operator_type = operator_token.token_type
     # Compile the operand
     operand = self.parse_precedence(Precedence.UNARY)
     if operand is None:
         return None
 
-    unaryop: ast_defs.unaryop | None = None
-    if operator_type == TokenType.MINUS:
-        unaryop = ast_defs.USub(operator_token)
-    elif operator_type == TokenType.NOT:
-        unaryop = ast_defs.Not(operator_token)
-    else:
-        # Shouldn't happen
-        assert False, "Unreachable code"
+    unaryop_type = _UNOP_TYPES.get(operator_token.tt_id)
+    assert unaryop_type is not None, "Unreachable code"
 
-    self.curr_node = ast_defs.UnaryOp(operator_token, unaryop, operand)
+    self.curr_node = ast_defs.UnaryOp(
+        operator_token, unaryop_type(operator_token), operand
+    )
 
 
 def make_vector(self: Parser, can_assign: bool) -> None:
@@ -516,12 +666,6 @@ def group_name(self: Parser, can_assign: bool) -> None:
     if ret is None:
         return None
     pos_args, keyword_args = ret
-    # Special handling: convert join_geometry(a, b, c) -> join_geometry([a, b, c]) ...but dont tell mf add-on about it...
-    if isinstance(func, ast_defs.Name) and func.id == "join_geometry":
-        if len(pos_args) > 1:
-            from .ast_defs import ListLiteral
-            list_expr = ListLiteral(token, pos_args)
-            pos_args = [list_expr]
     self.curr_node = ast_defs.Call(token, func, pos_args, keyword_args)
 
 
@@ -536,12 +680,6 @@ def call(self: Parser, can_assign: bool) -> None:
     if ret is None:
         return
     pos_args, keyword_args = ret
-    # Special handling: convert join_geometry(a, b, c) -> join_geometry([a, b, c])
-    if isinstance(func, ast_defs.Name) and func.id == "join_geometry":
-        if len(pos_args) > 1:
-            from .ast_defs import ListLiteral
-            list_expr = ListLiteral(token, pos_args)
-            pos_args = [list_expr]
     self.curr_node = ast_defs.Call(token, func, pos_args, keyword_args)
 
 
@@ -552,57 +690,32 @@ def dot(self: Parser, can_assign: bool) -> None:
     value = self.curr_node
     if value is None:
         return
-    else:
-        assert isinstance(value, ast_defs.expr)
-    self.curr_node = ast_defs.Attribute(token, value, identifier_token.lexeme)
+    self.curr_node = ast_defs.Attribute(
+        token, cast(ast_defs.expr, value), identifier_token.lexeme
+    )
 
 
 def binary(self: Parser, can_assign: bool) -> None:
     operator_token = self.previous
-    operator_type = operator_token.token_type
     left = self.curr_node
-    rule = self.get_rule(operator_type)
-    right: ast_defs.expr | None = self.parse_precedence(
-        Precedence(rule.precedence.value + 1)  # type: ignore
+    # The int overload of parse_precedence returns stmt, but every int
+    # here is above ASSIGNMENT, so the result can only be an expr.
+    right = cast(
+        "ast_defs.expr | None",
+        self.parse_precedence(_NEXT_PREC[_RULES[operator_token.tt_id][2]]),
     )
     if left is None or right is None:
         return
-    else:
-        assert isinstance(left, ast_defs.expr) and isinstance(right, ast_defs.expr)
 
     # math: + - / * % > < **
-    operation: ast_defs.operator | None = None
-    if operator_type == TokenType.PLUS:
-        operation = ast_defs.Add(operator_token)
-    elif operator_type == TokenType.MINUS:
-        operation = ast_defs.Sub(operator_token)
-    elif operator_type == TokenType.SLASH:
-        operation = ast_defs.Div(operator_token)
-    elif operator_type == TokenType.STAR:
-        operation = ast_defs.Mult(operator_token)
-    elif operator_type == TokenType.PERCENT:
-        operation = ast_defs.Mod(operator_token)
-    elif operator_type in (TokenType.STAR_STAR, TokenType.HAT):
-        operation = ast_defs.Pow(operator_token)
-    elif operator_type == TokenType.GREATER:
-        operation = ast_defs.Gt(operator_token)
-    elif operator_type == TokenType.GREATER_EQUAL:
-        operation = ast_defs.GtE(operator_token)
-    elif operator_type == TokenType.LESS:
-        operation = ast_defs.Lt(operator_token)
-    elif operator_type == TokenType.LESS_EQUAL:
-        operation = ast_defs.LtE(operator_token)
-    elif operator_type == TokenType.EQUAL_EQUAL:
-        operation = ast_defs.Eq(operator_token)
-    elif operator_type == TokenType.BANG_EQUAL:
-        operation = ast_defs.NotEq(operator_token)
-    elif operator_type == TokenType.AND:
-        operation = ast_defs.And(operator_token)
-    elif operator_type == TokenType.OR:
-        operation = ast_defs.Or(operator_token)
-    else:
-        assert False, "Unreachable code"
-    self.curr_node = ast_defs.BinOp(operator_token, left, operation, right)
+    operator_type_class = _BINOP_TYPES.get(operator_token.tt_id)
+    assert operator_type_class is not None, "Unreachable code"
+    self.curr_node = ast_defs.BinOp(
+        operator_token,
+        cast(ast_defs.expr, left),
+        operator_type_class(operator_token),
+        right,
+    )
 
 
 rules: list[ParseRule] = [
@@ -651,3 +764,14 @@ rules: list[ParseRule] = [
     ParseRule(None, None, Precedence.NONE),  # EOL
 ]
 assert len(rules) == TokenType.EOL.value + 1, "Didn't handle all tokens!"
+
+# Flat (prefix, infix, precedence value) triples indexed by token type
+# value, so the Pratt loop doesn't touch ParseRule attributes or IntEnum
+# members per token. Attaching the rules directly to the TokenType
+# members was measured as the alternative layout and lost: indexing this
+# tuple with the cached tt_id int is faster than the two attribute loads
+# of token.token_type.prefix, and it keeps the scanner free of parser
+# knowledge.
+_RULES: tuple[tuple, ...] = tuple(
+    (rule.prefix, rule.infix, rule.precedence.value) for rule in rules
+)
@@ -70,6 +70,17 @@ class Token:
     - a number `start` which says where in the text the token starts
     """
 
+    __slots__ = (
+        "token_type",
+        "tt_id",
+        "start",
+        "line",
+        "col",
+        "lexeme",
+        "error",
+        "value",
+    )
+
     def __init__(
         self,
         lexeme: str,
@@ -78,13 +89,20 @@ class Token:
         col: int = 0,
         start: int = 0,
         error: str | None = None,
+        value: int | float | None = None,
     ) -> None:
         self.token_type = token_type
+        # The plain int value of `token_type`, cached so the parser's
+        # hot paths can compare ints instead of IntEnum members.
+        self.tt_id = token_type.value
         self.start = start
         self.line = line
         self.col = col
         self.lexeme = lexeme
         self.error = error
+        # For INT and FLOAT tokens the scanner stores the parsed number
+        # here so the parser never reparses the lexeme.
+        self.value = value
 
     def __str__(self) -> str:
         return f"[{self.lexeme}, {self.token_type.name}]"
@@ -203,10 +221,15 @@ class Scanner:
         if self.peek() == ".":
             if self.peek_next().isalpha():
                 # Syntax like 5.sin()
-                return self.make_token(TokenType.INT)
+                return self.int_token()
             self.advance()
             return self.float()
-        return self.make_token(TokenType.INT)
+        return self.int_token()
+
+    def int_token(self) -> Token:
+        token = self.make_token(TokenType.INT)
+        token.value = int(token.lexeme)
+        return token
 
     def float(self) -> Token:
         """
@@ -215,7 +238,9 @@ class Scanner:
         """
         while self.peek().isdecimal():
             self.advance()
-        return self.make_token(TokenType.FLOAT)
+        token = self.make_token(TokenType.FLOAT)
+        token.value = float(token.lexeme)
+        return token
 
     def python(self) -> Token:
         """Get the string in between ()"""
@@ -277,6 +302,7 @@ class Scanner:
                 if token.token_type == TokenType.ERROR:
                     return token
                 token.token_type = TokenType.GROUP_NAME
+                token.tt_id = TokenType.GROUP_NAME.value
                 return token
         if c.isalpha():
             return self.identifier()
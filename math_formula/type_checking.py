@@ -29,9 +29,18 @@ class TypeChecker:
     def type_check(self, source: str) -> bool:
         parser = Parser(source)
         ast = parser.parse()
-        self.errors = parser.errors
         if parser.had_error:
+            self.errors = parser.errors
             return False
+        return self.type_check_ast(ast)
+
+    def type_check_ast(self, ast: ast_defs.Module) -> bool:
+        """Type check an already parsed module.
+
+        This lets callers parse a source once and feed the same AST to
+        multiple type checkers.
+        """
+        self.errors = []
         statements = ast.body
         for statement in statements:
             try:
@@ -307,11 +316,22 @@ class TypeChecker:
             )
         elif isinstance(expr, ast_defs.Call):
             self.func_call(expr)
-        elif isinstance(expr, ast_defs.ListLiteral): # Simple support for lists supporting geometry into the join_geometry node
+        elif isinstance(expr, ast_defs.ListLiteral):
+            # Simple support for lists of geometries going into the
+            # join_geometry node. Each element is type checked like any
+            # other expression, so names are instantiated and calls are
+            # resolved before the compiler sees them.
+            elements: list[td.ty_expr] = []
             for e in expr.elements:
                 self.check_expr(e)
-            expr.type = td.DataType.GEOMETRY
-            self.curr_node = td.Const(td.StackType.VALUE, [expr.type], [], expr.elements)
+                element = self.curr_node
+                assert isinstance(
+                    element, td.ty_expr
+                ), "List element should be an expression"
+                elements.append(element)
+            self.curr_node = td.TyList(
+                td.StackType.VALUE, [td.DataType.GEOMETRY], [], elements
+            )
             return
         else:
             print(expr, type(expr))
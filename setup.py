@@ -0,0 +1,34 @@
+"""Optional mypyc build for the math_formula parser hot path.
+
+The scanner and Pratt parser are interpreter-bound, and both files are
+fully type-annotated, which is exactly what mypyc wants. Running
+
+    python setup.py build_ext --inplace
+
+from the repository root produces compiled extension modules inside
+math_formula/ next to the plain sources. Python prefers the extensions when they exist, and the
+add-on keeps working from the .py files when they don't, so this is
+purely opt-in: the add-on is distributed as source and Blender bundles
+a different Python per release, which rules out shipping prebuilt
+binaries.
+"""
+try:
+    from mypyc.build import mypycify
+except ImportError:
+    raise SystemExit("mypy is required for the optional compiled parser")
+
+from setuptools import setup
+
+setup(
+    name="math_formula_parser_ext",
+    ext_modules=mypycify(
+        [
+            "math_formula/scanner.py",
+            "math_formula/ast_defs.py",
+            "math_formula/mf_parser.py",
+        ],
+        # One self-contained extension per module, so no shared shim
+        # library has to live outside the add-on directory.
+        separate=True,
+    ),
+)